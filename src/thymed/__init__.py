@@ -6,18 +6,37 @@ related to to time-keeping.
 
 import datetime as dt
 import json
-from copy import copy
+import os
+import sys
+import tempfile
 from dataclasses import dataclass
 from dataclasses import field
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
-import pandas as pd
 import toml
-from rich.console import Console
-from rich.panel import Panel
+
+
+# The stdlib TOML parser (3.11+) is much faster than toml's, which is
+# still needed to write the default config.
+# Only the branch for older Pythons is left out of coverage.
+if sys.version_info >= (3, 11):
+    import tomllib
+else:  # pragma: no cover
+    tomllib = None
+
+# pandas and rich are slow to import, and most commands (like a punch)
+# never need pandas. They're imported where they're used instead.
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+    from rich.console import Console
 
 
 # CONSTANTS
@@ -27,44 +46,87 @@ from rich.panel import Panel
 __DIR = Path.home() / Path(".thymed")
 __CONFIG = __DIR / Path("config.toml")
 
-if not __DIR.exists():
-    # This is the first time a user has run Thymed.
-    __DIR.mkdir()
-    __CONFIG.touch()
-    PUNCHFILE = Path(__DIR / "thymed_punches.dat")
-    CHARGEFILE = Path(__DIR / "thymed_codes.json")
-    default_config = f"""
-        title = "Thymed Config"
-
-        [database]
-        # Where all charging punches are recorded
-        data = "{PUNCHFILE.as_posix()}"
 
-        # Where all charge code objects are recorded
-        charges = "{CHARGEFILE.as_posix()}"
+@lru_cache(maxsize=None)
+def _options() -> Dict[str, Any]:
+    """Read the config file, only once, the first time it's needed.
 
-        # The default charge code
-        default = 0
+    Simply importing thymed (e.g. for `thymed --help`) never touches
+    the disk. The first run also writes out the default config.
     """
-    parsed_toml = toml.loads(default_config)
-    with open(__CONFIG, "w") as f:
-        _ = toml.dump(parsed_toml, f)
+    if not __DIR.exists():
+        # This is the first time a user has run Thymed.
+        __DIR.mkdir()
+        __CONFIG.touch()
+        punchfile = Path(__DIR / "thymed_punches.dat")
+        chargefile = Path(__DIR / "thymed_codes.json")
+        default_config = f"""
+            title = "Thymed Config"
+
+            [database]
+            # Where all charging punches are recorded
+            data = "{punchfile.as_posix()}"
+
+            # Where all charge code objects are recorded
+            charges = "{chargefile.as_posix()}"
+
+            # The default charge code
+            default = 0
+        """
+        parsed_toml = toml.loads(default_config)
+        with open(__CONFIG, "w") as f:
+            _ = toml.dump(parsed_toml, f)
+
+    if sys.version_info >= (3, 11):
+        with open(__CONFIG, "rb") as f:
+            return tomllib.load(f)
+    else:  # pragma: no cover
+        with open(__CONFIG) as f:
+            return toml.load(f)
+
+
+# The data files to store information, _DATA and _CHARGES.
+# Controlled in the CONFIG file, and therefore customizable by user.
+# They're resolved on first access (see __getattr__ below), and then kept
+# as plain module globals, so they can still be reassigned (e.g. in tests).
+_DATAFILES = {"_DATA": "data", "_CHARGES": "charges"}
 
 
-with open(__CONFIG) as f:
-    __OPTIONS = toml.load(f)
+def __getattr__(name: str) -> Any:
+    """Resolve the data file paths from the config, on first access."""
+    if name in _DATAFILES:
+        return _datafile(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# The data file to store information.
-# Controlled in the CONFIG file, and therefore customizable by user
-_DATA = Path(__OPTIONS["database"]["data"])
-_CHARGES = Path(__OPTIONS["database"]["charges"])
 
-# If the datafiles don't exist, we need to make them
-if not _DATA.exists():
-    _DATA.touch()
+def _datafile(name: str) -> Path:
+    """Return the current path of a data file, resolving it if needed."""
+    path = globals().get(name)
+    if path is None:
+        path = Path(_options()["database"][_DATAFILES[name]])
+        globals()[name] = path
+    return path
 
-if not _CHARGES.exists():
-    _CHARGES.touch()
+
+def _now() -> dt.datetime:
+    """Return the time of a punch (tests swap this for a fake clock)."""
+    return dt.datetime.now()
+
+
+# The datafiles aren't made here either. They're created on their first
+# write, and every reader treats a missing file the same as a blank one.
+
+# Parsed contents of the data files, keyed by path. Each entry also stores
+# the (mtime, size) stamp of the file when it was read, so any write to the
+# file (by us, or by another process) invalidates it.
+_FILE_CACHE: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+# The permissions of a new data file, as limited by the umask. The umask
+# can only be read by setting it, which would race with writes from the
+# TUI's worker threads, so it's read once, on import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_NEW_FILE_MODE = 0o666 & ~_UMASK
 
 
 # Classes
@@ -90,7 +152,7 @@ class ChargeCode:
     description: str
     id: int
 
-    times: List[Tuple[dt.datetime, dt.datetime]] = field(default_factory=list)
+    times: List[Tuple[dt.datetime, ...]] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         """Stuff to do right after instantiation.
@@ -99,26 +161,54 @@ class ChargeCode:
         the times. If existing data is in the record for this charge code
         id, the times array will be initialized as that complete array.
         """
+        # Read the existing file (or its cached parse) and store it
+        try:
+            existing = _load_json(_datafile("_DATA"))
+        except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
+            # A missing or blank file (fresh install) has nothing to read in
+            return
+
+        # Keys read from the JSON will be str, so look up the str id
+        # directly instead of converting every key to an int.
+        str_times = existing.get(str(self.id))
+        if str_times is not None:
+            # Bind the parser locally, and build every punch in
+            # one comprehension instead of a generator per entry.
+            parse = _parse_iso
+            self.times.extend([tuple(map(parse, e)) for e in str_times])
+
+    @classmethod
+    def load_all(cls) -> List["ChargeCode"]:
+        """Read in every stored ChargeCode, sorted by id.
+
+        Both data files are parsed once, and each code takes its times
+        straight from that parse. Decoding the codes one at a time would
+        look up the punch file again in every __post_init__.
+        """
+        try:
+            codes = _load_json(_datafile("_CHARGES"))
+        except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
+            # No codes defined yet (fresh install)
+            return []
         try:
-            with open(_DATA) as infile:
-                # Read the existing file and store it
-                try:
-                    existing = json.load(infile)
-                    # Keys read from the JSON will be str. Convert to int
-                    keys = [int(key) for key in existing.keys()]
-                    # However, keys in the final are still str, so use an fstring
-                    if self.id in keys:
-                        str_times = existing[f"{self.id}"]
-                        for entry in str_times:
-                            self.times.append(
-                                tuple(dt.datetime.fromisoformat(time) for time in entry)
-                            )
-                except json.JSONDecodeError:  # pragma: no cover
-                    # If the file is completely blank, we will get an error
-                    pass
-        except Exception as e:  # pragma: no cover
-            # Otherwise, let me know what went wrong
-            raise e
+            existing = _load_json(_datafile("_DATA"))
+        except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
+            # Codes defined, but never punched
+            existing = {}
+
+        parse = _parse_iso
+        loaded = []
+        for key in sorted(codes, key=int):
+            obj = codes[key]
+            # Skip the normal __init__, since post_init would read the
+            # punches file again. Set the same fields it would instead.
+            code = cls.__new__(cls)
+            code.name = obj["name"]
+            code.description = obj["description"]
+            code.id = obj["id"]
+            code.times = [tuple(map(parse, e)) for e in existing.get(key, ())]
+            loaded.append(code)
+        return loaded
 
     @property
     def is_active(self) -> Any:
@@ -132,84 +222,122 @@ class ChargeCode:
 
     def punch(self) -> None:
         """Punch in/out of chargeable time."""
-        if self.is_active:
+        # Same check as is_active, inlined to skip the property lookup.
+        times = self.times
+        if times and len(times[-1]) == 1:
             # Close the code.
-            self.times[-1] = (self.times[-1][0], dt.datetime.now())
+            times[-1] = (times[-1][0], _now())
         else:
             # Open the code.
-            self.times.append((dt.datetime.now(),))
+            times.append((_now(),))
 
-    def write_json(self, data: Path = _DATA, log: bool = False) -> None:
+    def punch_many(
+        self, ins: Sequence[dt.datetime], outs: Sequence[dt.datetime]
+    ) -> None:
+        """Add many closed punches at once, e.g. to import historical data.
+
+        Each clock in is paired with the clock out at the same position.
+        Like punch, this only changes the times in memory. Call write_json
+        once afterwards to save them all.
+        """
+        if len(ins) != len(outs):
+            raise ValueError("Every clock in needs a matching clock out!")
+        self.times.extend(zip(ins, outs))
+
+    def write_json(
+        self, data: Optional[Path] = None, log: bool = False, pretty: bool = False
+    ) -> None:
         """Write the times data to a json file.
 
         Read the file first, then append the times to their
-        appropriate charge code number.
+        appropriate charge code number. Writes to the configured
+        punch file, unless another data file is given. The file is
+        written compactly, unless pretty is set to indent it for reading.
         """
-        console = Console()
-        _times = []
-        for entry in self.times:
-            # Open punches are of length 1
-            # Closed punches are of length 2
-            # Either way, append it as a tuple of isoformat
-            _times.append(tuple(time.isoformat() for time in entry))
+        console = _get_console()
+        key = str(self.id)
+        # A str path works too, as it did with open()
+        data = _datafile("_DATA") if data is None else Path(data)
 
         # Need to attempt some tidy data handling
         try:
-            with open(data) as infile:
-                # Read the existing file and store it
-                existing = json.load(infile)
-                # # Make a copy, just for clarity
-                # We need the copy to carry all the data which does not pertain
-                # to the current specific ChargeCode.
-                final_data = copy(existing)
-                # We overwrite data directly here, because the post_init method
-                # reads the same file.
-                final_data[f"{self.id}"] = _times
+            # Read the existing file and store it. It carries all the data
+            # which does not pertain to the current specific ChargeCode.
+            # It's updated in place, so take it out of the cache first:
+            # even if the write fails, no reader gets our datetimes.
+            final_data = _load_json(data)
+            _FILE_CACHE.pop(data, None)
+            # We overwrite data directly here, because the post_init method
+            # reads the same file.
+            final_data[key] = self.times
+        except FileNotFoundError:  # pragma: no cover
+            # The very first punch, so there's nothing else to keep
+            final_data = {key: self.times}
         except json.JSONDecodeError:  # pragma: no cover
             # Unless we can't read the file
             console.log("[red]Got JSONDecodeError, assuming the file was blank...")
-            final_data = {self.id: _times}
+            final_data = {key: self.times}
 
         # Serializing json
         if log:
             console.print("Serializing JSON-formatted time data...")
-        json_object = json.dumps(final_data, indent=2)
+        # Open punches are of length 1, closed punches are of length 2.
+        # Either way, the encoder writes each datetime as an isoformat str.
+        json_object = _dumps(final_data, pretty)
         if log:
             console.print(json_object)
 
         # Write json
-        with open(data, "w") as outfile:
-            if log:
-                console.print("Writing JSON data to file...")
-            outfile.write(json_object)
-
-    def write_class(self) -> None:
-        """Write the class to the Charges json file."""
-        out = copy(self.__dict__)
+        if log:
+            console.print("Writing JSON data to file...")
+        _atomic_write(data, json_object)
+
+    def write_class(self, pretty: bool = False) -> None:
+        """Write the class to the Charges json file.
+
+        Like write_json, the file is only indented if pretty is set.
+        """
+        # Everything but the punches, which live in the data file instead.
+        out = {k: v for k, v in self.__dict__.items() if k != "times"}
         out["__type__"] = "ChargeCode"
-        del out["times"]
 
-        # Read the stored data
-        with open(_CHARGES) as f:
-            try:
-                codes = json.load(f)
-            except json.JSONDecodeError:  # pragma: no cover
-                # If the file is completely blank, we will get an error
-                codes = dict()
+        # Read the stored data (or its cached parse)
+        charges = _datafile("_CHARGES")
+        try:
+            codes = _load_json(charges)
+        except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
+            # If the file is missing or completely blank, we will get an error
+            codes = dict()
 
         # We're going to write new data
-        with open(_CHARGES, "w") as f:
-            # If the current code is not in the keys
-            if not str(self.id) in codes.keys():
-                # We can create a new entry for it
-                codes[self.id] = out
-            else:
-                # A ChargeCode with the id already exists
-                # TODO: prompt user and ask for overwrite
-                pass
+        # If the current code is not in the keys (test the dict directly)
+        if str(self.id) in codes:
+            # A ChargeCode with the id already exists, so the file
+            # would be rewritten as-is. Skip the write entirely.
+            # TODO: prompt user and ask for overwrite
+            return
+        # We can create a new entry for it. The cached dict is updated in
+        # place, so drop it from the cache first, in case the write fails.
+        _FILE_CACHE.pop(charges, None)
+        codes[self.id] = out
+
+        # Write the exact data to file
+        _atomic_write(charges, _dumps(codes, pretty))
+
+    def save(self, pretty: bool = False) -> None:
+        """Save the ChargeCode and its times, e.g. right after a punch.
+
+        The Charges file is only rewritten when the code is new. For a
+        punch on an existing code, only the data file gets written.
+        """
+        self.write_class(pretty)
+        self.write_json(pretty=pretty)
 
-            # Write the exact data to file
-            _ = f.write(json.dumps(codes, indent=2))
+
+# The minutes of a punch as tenths of an hour, exactly as Python's round()
+# gives them. Rounding the whole column with Series.round would round some
+# halves the other way (e.g. 39 minutes would be 0.6 instead of 0.7).
+_MINUTE_TENTHS = {float(m): round(m / 60, 1) for m in range(60)}
 
 
 @dataclass
@@ -227,7 +355,7 @@ class TimeCard:
         """Grab the ChargeCode with the given id."""
         self.code = get_code(self.id)
 
-    def general_report(self, start: dt.datetime, end: dt.datetime) -> pd.DataFrame:
+    def general_report(self, start: dt.datetime, end: dt.datetime) -> "pd.DataFrame":
         """A general method to pull times data.
 
         Specify a start and end date. This method will
@@ -237,20 +365,37 @@ class TimeCard:
 
         Start and End can theoretically be any datetime object.
         """
-        df = pd.DataFrame(self.code.times, columns=["clock_in", "clock_out"])
-        df["duration"] = df.clock_out - df.clock_in
-        df["hours"] = df.duration.apply(
-            lambda x: x.components.hours + round(x.components.minutes / 60, 1)
+        import pandas as pd
+
+        # Build the frame from whole columns, rather than row tuples, so both
+        # columns are datetime64 from the start (even with no punches).
+        times = self.code.times
+        df = pd.DataFrame(
+            {
+                "clock_in": pd.to_datetime([entry[0] for entry in times]),
+                "clock_out": pd.to_datetime(
+                    [entry[1] if len(entry) == 2 else None for entry in times]
+                ),
+            }
         )
-        df["week"] = df.clock_in.dt.isocalendar().week
+        # Filter first, so the derived columns are only computed for the
+        # punches inside the window instead of the whole history.
+        date_set = df.loc[df.clock_in.between(start, end)].copy()
+        date_set["duration"] = date_set.clock_out - date_set.clock_in
+        # Work from the total seconds, rather than building the whole
+        # .dt.components frame. Whole hours (days dropped) plus the minutes
+        # in tenths of an hour; open punches stay NaN.
+        seconds = date_set.duration.dt.total_seconds()
+        minutes = seconds % 3600 // 60
+        date_set["hours"] = (seconds // 3600 % 24) + minutes.map(_MINUTE_TENTHS)
+        date_set["week"] = date_set.clock_in.dt.isocalendar().week
         # Day 0 corresponds to Monday, Day 6 = Sunday
-        df["day"] = df.clock_in.dt.day_of_week
-        df["weekday"] = df.clock_in.apply(lambda x: x.strftime("%A"))
-        date_set = df.loc[df.clock_in <= end].loc[df.clock_in >= start].copy()
+        date_set["day"] = date_set.clock_in.dt.day_of_week
+        date_set["weekday"] = date_set.clock_in.dt.day_name()
 
         return date_set
 
-    def weekly_report(self) -> pd.DataFrame:
+    def weekly_report(self) -> "pd.DataFrame":
         """Generates a report of all activity.
 
         This method takes today's date, and returns a
@@ -261,7 +406,7 @@ class TimeCard:
 
         return self.general_report(start, today)
 
-    def pay_period_report(self) -> pd.DataFrame:
+    def pay_period_report(self) -> "pd.DataFrame":
         """Generates a report of all activity.
 
         This method takes today's date, and returns a
@@ -272,7 +417,7 @@ class TimeCard:
 
         return self.general_report(start, today)
 
-    def monthly_report(self) -> pd.DataFrame:
+    def monthly_report(self) -> "pd.DataFrame":
         """Generates a report of all activity.
 
         This method takes today's date, and returns a
@@ -283,7 +428,7 @@ class TimeCard:
 
         return self.general_report(start, today)
 
-    def to_excel(self, report: pd.DataFrame, folder: Path) -> Path:
+    def to_excel(self, report: "pd.DataFrame", folder: Path) -> Path:
         """This method just saves the report to the directory provided."""
         name = self.code.name.replace(" ", "_").replace("'", "")
         filepath = folder / Path(f"{name}_report.xlsx")
@@ -294,7 +439,95 @@ class TimeCard:
 # Functions
 
 
-def object_decoder(obj) -> Any:
+def _encode_datetime(obj: Any) -> str:
+    """Encoder hook to serialize punch datetimes in isoformat."""
+    if isinstance(obj, dt.datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def _get_console() -> "Console":
+    """Return the Console shared by all of thymed's output.
+
+    Making a Console probes the terminal, so it's only done once.
+    """
+    from rich.console import Console
+
+    return Console()
+
+
+def _dumps(obj: Any, pretty: bool = False) -> str:
+    """Serialize the contents of a data file.
+
+    The files are machine-written, so by default they're written without
+    any whitespace. That's roughly half the bytes of an indented file.
+    """
+    if pretty:
+        return json.dumps(obj, indent=2, default=_encode_datetime)
+    return json.dumps(obj, separators=(",", ":"), default=_encode_datetime)
+
+
+@lru_cache(maxsize=1 << 17)
+def _parse_iso(text: str) -> dt.datetime:
+    """Parse a stored isoformat timestamp.
+
+    Results are memoized, since the same punches get read in again every
+    time a ChargeCode is instantiated (e.g. each TimeCard in the TUI).
+    datetimes are immutable, so sharing them between codes is safe.
+    """
+    return dt.datetime.fromisoformat(text)
+
+
+def _load_json(path: Path) -> Any:
+    """Parse a JSON data file, reusing the last parse while it's unchanged.
+
+    Raises json.JSONDecodeError, like json.load, if the file is blank.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    parsed = json.loads(path.read_bytes())
+    _FILE_CACHE[path] = (stamp, parsed)
+    return parsed
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Replace the contents of a data file in a single step.
+
+    The text is written and synced to a temporary file next to the target,
+    then renamed over it. A crash mid-write leaves the old file intact,
+    instead of a truncated one. The temporary name is unique, so two
+    processes writing at once can't clobber each other's half-written file.
+
+    A symlinked data file is followed, so its target gets the new text,
+    and the file keeps its permissions (like a plain open would).
+    """
+    path = Path(path).resolve()
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE
+
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        # mkstemp always creates the file private to the user
+        os.chmod(tmp, mode)
+        with open(fd, "wb") as f:
+            f.write(text.encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        # Never leave a stray temporary file behind
+        os.unlink(tmp)
+        raise
+
+
+def object_decoder(obj: Dict[str, Any]) -> Any:
     """Decoder hook for the ChargeCode class."""
     if "__type__" in obj and obj["__type__"] == "ChargeCode":
         return ChargeCode(obj["name"], obj["description"], obj["id"])
@@ -304,26 +537,29 @@ def object_decoder(obj) -> Any:
 def get_code(id: int) -> Any:
     """Read stored data and return the ChargeCode specified."""
     assert type(id) is int, "ID must be an int!"
-    console = Console()
-    with open(_CHARGES) as f:
-        try:
-            codes = json.load(f, object_hook=object_decoder)
-        except json.JSONDecodeError:  # pragma: no cover
-            # If the Charges file is completely blank (fresh install),
-            # It will read with a length of zero. We should skip this
-            # to avoid testing or runtime errors. Notify the user and exit.
-            console = Console()
-            console.print(
-                "Looks like you're trying to use a ChargeCode "
-                "without first defining any codes! Try running `thymed create` "
-                "first."
-            )
-            codes = dict()
+    from rich.panel import Panel
+
+    console = _get_console()
+    try:
+        # Parse plain dicts (the parse is reused until the file changes).
+        # Decoding every record into a ChargeCode would read in the
+        # punches of every code, just to return one.
+        codes = _load_json(_datafile("_CHARGES"))
+    except (FileNotFoundError, json.JSONDecodeError):  # pragma: no cover
+        # If the Charges file is missing or completely blank (fresh
+        # install), there's nothing to read. We should skip this
+        # to avoid testing or runtime errors. Notify the user and exit.
+        console.print(
+            "Looks like you're trying to use a ChargeCode "
+            "without first defining any codes! Try running `thymed create` "
+            "first."
+        )
+        codes = dict()
     try:
         # We assert id is an int, so it's safe to convert into string.
         # Without asserting at the beginning, you could pass thru weird
         # keys that are plain strings, or even something malicious.
-        code = codes[str(id)]
+        code = object_decoder(codes[str(id)])
     except KeyError:
         text = (
             f"Cannot find the charge code with id: {id}\n"
@@ -1,11 +1,9 @@
 """Command-line interface."""
 
-import json
 from importlib.metadata import version
 from typing import Any
 
 import click
-from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Confirm
 from rich.prompt import IntPrompt
@@ -14,7 +12,6 @@ from rich.table import Table
 from rich.traceback import install
 
 import thymed
-from thymed.tui import ThymedApp
 
 
 install()
@@ -39,7 +36,7 @@ def main() -> None:  # pragma: no cover
 @main.command()
 def hello():
     """See information about Thymed."""
-    console = Console()
+    console = thymed._get_console()
     console.print("Hello World!\n")
     console.print(
         "I am [spring_green3 italic]Thymed.[/] " "Simple command-line time-tracking."
@@ -54,12 +51,12 @@ def default_code() -> Any:
     If no default id is defined, raises a warning.
     """
     try:
-        default_id = thymed.__OPTIONS["database"]["default"]
+        default_id = thymed._options()["database"]["default"]
         return thymed.get_code(default_id)
     except KeyError:
         # KeyError means default code isn't set. We should notify user,
         # and exit.
-        console = Console()
+        console = thymed._get_console()
         text = (
             "Looks like you haven't set a default ChargeCode, "
             "or the code provided isn't in the database somehow. "
@@ -95,7 +92,7 @@ def punch(id) -> None:
     elif len(id) == 1:
         id = id[0]
 
-    console = Console()
+    console = thymed._get_console()
     console.print("[spring_green3 italic]Thymed.[/]\n")
     if not id:
         code = default_code()
@@ -108,8 +105,7 @@ def punch(id) -> None:
 
     console.print(f"Punching Charge Code: [medium_spring_green]{code.name}")
     code.punch()
-    code.write_class()
-    code.write_json()
+    code.save()
     console.print("[spring_green3 italic]   ...Done!")
 
 
@@ -119,7 +115,7 @@ def create():
 
     Create a new ChargeCode object with the given id.
     """
-    console = Console()
+    console = thymed._get_console()
     name = Prompt.ask("Enter a name for the ChargeCode")
     description = Prompt.ask("Description for this ChargeCode")
     id = IntPrompt.ask("A unique identifier for this code (integer value)")
@@ -142,19 +138,10 @@ def create():
 @main.command()
 def list():
     """List out all the available charge codes."""
-    with open(thymed._CHARGES) as f:
-        try:
-            codes = json.load(f, object_hook=thymed.object_decoder)
-
-            # Sort the codes dictionary by key (code id)
-            sorted_codes = sorted(codes.items(), key=lambda kv: int(kv[0]))
-            codes = [x[1] for x in sorted_codes]
-        except json.JSONDecodeError:  # pragma: no cover
-            print("Got JSON Error")
-            # If the file is completely blank, we will get an error
-            codes = dict()
-
-    console = Console()
+    # Already sorted by code id, and empty if no codes are defined yet
+    codes = thymed.ChargeCode.load_all()
+
+    console = thymed._get_console()
     table = Table(title="ChargeCodes in Current Database", style="spring_green2")
     table.add_column("ID", justify="right", style="green", no_wrap=True)
     table.add_column("NAME", style="spring_green3 italic")
@@ -176,6 +163,9 @@ def tui():
     many users may prefer or need the TUI for interacting
     with Thymed. It's quite robust and polished! Give it a try!
     """
+    # Textual is slow to import, and only the TUI needs it.
+    from thymed.tui import ThymedApp
+
     app = ThymedApp()
     app.run()
 
@@ -4,11 +4,15 @@ The Text User Interface is all created, managed,
 and tested with Textual.
 """
 
-import json
 from time import monotonic
+from typing import List
+from typing import Set
+from typing import Tuple
+from typing import cast
 
 # from rich.text import Text
 # from textual import events
+from textual import work
 from textual.app import App
 from textual.app import ComposeResult
 from textual.containers import Container
@@ -31,19 +35,22 @@ import thymed
 # from typing import Coroutine
 
 
-ROWS = [("ID", "NAME", "DESCRIPTION", "ACTIVE")]
-with open(thymed._CHARGES) as f:
-    try:
-        codes = json.load(f, object_hook=thymed.object_decoder)
+HEADER = ("ID", "NAME", "DESCRIPTION", "ACTIVE")
 
-        # Sort the codes dictionary by key (code id)
-        sorted_codes = sorted(codes.items(), key=lambda kv: int(kv[0]))
-        codes = [x[1] for x in sorted_codes]
-    except json.JSONDecodeError:  # pragma: no cover
-        codes = dict()
+# Zero-padded strings for 0-99, to format the stopwatch digits.
+_TWO_DIGITS = [f"{i:02d}" for i in range(100)]
 
-for code in codes:
-    ROWS.append((str(code.id), code.name, code.description, str(code.is_active)))
+
+def _load_rows() -> List[Tuple[str, str, str, str]]:
+    """Read the ChargeCode table rows from the Charges file.
+
+    This is called when the app mounts, instead of when this module is
+    imported, and reads every code (sorted by id) in a single pass.
+    """
+    return [
+        (str(code.id), code.name, code.description, str(code.is_active))
+        for code in thymed.ChargeCode.load_all()
+    ]
 
 
 class TimeDisplay(Static):
@@ -53,29 +60,40 @@ class TimeDisplay(Static):
     time = reactive(0.0)
     total = reactive(0.0)
     name = reactive("name")
+    # The text currently displayed
+    _shown = ""
 
-    def on_mount(self) -> None:
-        """Event handler called when widget is added to the app."""
-        self.update_timer = self.set_interval(1 / 60, self.update_time, pause=True)
+    def on_unmount(self) -> None:
+        """Stop ticking, if the display is removed while running."""
+        cast("Thymer", self.app).stop_display(self)
 
-    def update_time(self) -> None:
-        """Method to update the time to the current time."""
-        self.time = self.total + monotonic() - self.start_time
+    def update_time(self, now: float) -> None:
+        """Method to update the time to the current (monotonic) time."""
+        self.time = self.total + now - self.start_time
 
     def watch_time(self, time: float) -> None:
         """Called when the attribute changes."""
-        minutes, seconds = divmod(time, 60)
+        # Split whole centiseconds with integer math, rather than float
+        # divmod and format specs on every tick.
+        seconds, centis = divmod(round(time * 100), 100)
+        minutes, seconds = divmod(seconds, 60)
         hours, minutes = divmod(minutes, 60)
-        self.update(f"{self.name}\n{hours:02,.0f}:{minutes:02.0f}:{seconds:05.2f}")
+        pad = _TWO_DIGITS
+        text = f"{self.name}\n{hours:02,d}:{pad[minutes]}:{pad[seconds]}.{pad[centis]}"
+        # Only re-render when the displayed text actually changes
+        # (e.g. repeated stops and resets leave it the same).
+        if text != self._shown:
+            self._shown = text
+            self.update(text)
 
     def start(self) -> None:
         """Method to resume time updating."""
         self.start_time = monotonic()
-        self.update_timer.resume()
+        cast("Thymer", self.app).start_display(self)
 
     def stop(self) -> None:
         """Method to stop the time display updating."""
-        self.update_timer.pause()
+        cast("Thymer", self.app).stop_display(self)
         self.total += monotonic() - self.start_time
         self.time = self.total
 
@@ -184,9 +202,41 @@ class Thymer(App):
         """What to do on mount."""
         self.title = "Thymed"
         table = self.query_one(DataTable)
-        table.add_columns(*ROWS[0])
-        table.add_rows(ROWS[1:])
+        table.add_columns(*HEADER)
         table.cursor_type = "row"
+        self.load_codes(table)
+        # One timer ticks every running TimeDisplay, instead of a timer
+        # each. It's paused whenever none are running.
+        self.running: Set[TimeDisplay] = set()
+        self.ticker = self.set_interval(1 / 60, self.tick, pause=True)
+
+    def tick(self) -> None:
+        """Update every running TimeDisplay to the same current time."""
+        now = monotonic()
+        for display in self.running:
+            display.update_time(now)
+
+    def start_display(self, display: TimeDisplay) -> None:
+        """Start ticking a TimeDisplay."""
+        self.running.add(display)
+        self.ticker.resume()
+
+    def stop_display(self, display: TimeDisplay) -> None:
+        """Stop ticking a TimeDisplay (it's fine if it wasn't running)."""
+        self.running.discard(display)
+        if not self.running:
+            self.ticker.pause()
+
+    @work(thread=True, exclusive=True)
+    def load_codes(self, table: DataTable[str]) -> None:
+        """Fill the table from a worker thread, so the first frame isn't held up."""
+        rows = _load_rows()
+        self.call_from_thread(self._fill_table, table, rows)
+
+    def _fill_table(self, table: DataTable[str], rows: List[Tuple[str, ...]]) -> None:
+        """Add all the rows at once, with a single repaint at the end."""
+        with self.batch_update():
+            table.add_rows(rows)
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected):
         """Grab the selected ChargeCode."""
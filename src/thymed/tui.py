@@ -6,17 +6,26 @@ surrounded by a header and footer. Most of the functionality comes with
 the dynamic sidebar of functions.
 """
 
-import json
+import os
+import webbrowser
 from datetime import datetime
 from datetime import timedelta
+from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version
-from itertools import cycle
 from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+from typing import cast
 
 # import pandas as pd
 import textual
-from rich.console import RenderableType
 from rich.table import Table
+from textual import work
 from textual.app import App
 from textual.app import ComposeResult
 from textual.binding import Binding
@@ -39,15 +48,25 @@ from textual.widgets import Input
 from textual.widgets import Placeholder
 from textual.widgets import Static
 from textual.widgets import Switch
-from textual_plotext import PlotextPlot
+from textual.widgets.data_table import RowKey
 
 import thymed
 from thymed import TimeCard
 
 
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
 # from pathlib import Path
 
 
+# Looking up package metadata reads from disk, so only do it once.
+try:
+    __version__ = version("thymed")
+except PackageNotFoundError:  # pragma: no cover
+    # Running from a source tree that was never installed
+    __version__ = "unknown"
+
 SIDEBAR_INFO = """
 There are multiple tools available in Thymed. To use one, select it or hit the keybinding. The main area will be updated with the 'applet' along with some more information. :smiley:
 """  # noqa: B950
@@ -67,17 +86,31 @@ LOGO = """
 ░█░ █▀█ ░█░ █░▀░█ ██▄ █▄▀ ▄
 """
 
-PERIODS = cycle(
-    (
-        ("Week", timedelta(days=7)),
-        ("BiWeek", timedelta(days=14)),
-        ("Month", timedelta(days=30)),
-        ("Quarter", timedelta(days=90)),
-        ("Year", timedelta(days=365)),
-    )
+PERIODS = (
+    ("Week", timedelta(days=7)),
+    ("BiWeek", timedelta(days=14)),
+    ("Month", timedelta(days=30)),
+    ("Quarter", timedelta(days=90)),
+    ("Year", timedelta(days=365)),
 )
 
 
+_Applet = TypeVar("_Applet", bound=type)
+
+
+def with_info(cls: _Applet) -> _Applet:
+    """Class decorator to give an applet its info text.
+
+    Info is just a formatted version of the docstring: the first line,
+    then the rest of the docstring joined into one paragraph.
+    """
+    first, _, rest = (cls.__doc__ or "").partition("\n")
+    # Applets don't share a base class to declare info on
+    applet: Any = cls
+    applet.info = first + "\n" + " ".join([line.strip() for line in rest.splitlines()])
+    return cls
+
+
 class Title(Static):
     """A title widget."""
 
@@ -91,8 +124,13 @@ class OptionGroup(ScrollableContainer):
 
 
 class Version(Static):
-    def render(self) -> RenderableType:
-        return f"[b]Thymed v{version('thymed')}"
+    """The Thymed version, shown at the bottom of the Sidebar."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Set the version markup, passing other options on to Static."""
+        # Static parses this markup once, here. Returning the string from
+        # render would parse it again on every repaint.
+        super().__init__(f"[b]Thymed v{__version__}", **kwargs)
 
 
 class Sidebar(Container):
@@ -119,6 +157,7 @@ class InfoPane(Widget):
         return f"{self.info}"
 
 
+@with_info
 class PunchForm(Container):
     """Punch a ChargeCode.
 
@@ -127,13 +166,6 @@ class PunchForm(Container):
     provided ID will change state ('out' to 'in' or vice versa).
     """
 
-    # Info is just a formatted version of the docstring.
-    info = (
-        __doc__.split("\n")[0]
-        + "\n"
-        + " ".join([line.strip() for line in __doc__.split("\n")[1:]])
-    )
-
     def compose(self) -> ComposeResult:
         yield Digits("", id="clock")
         yield Static("ChargeCode ID:", classes="label")
@@ -141,7 +173,14 @@ class PunchForm(Container):
         yield Static()
         yield Button("Punch", variant="primary", id="punch")
 
+    def on_mount(self) -> None:
+        # The app only ticks the clock once a minute, so fill it in now.
+        # Hand over this form's clock, since an old one may still be
+        # on its way out.
+        cast("ThymedApp", self.app).update_clock(self.query_one("#clock", Digits))
+
 
+@with_info
 class ChargeManager(ScrollableContainer):
     """Manage the available ChargeCodes in the Database.
 
@@ -149,46 +188,67 @@ class ChargeManager(ScrollableContainer):
     buttons to add and remove items from the database.
     """
 
-    # Info is just a formatted version of the docstring.
-    info = (
-        __doc__.split("\n")[0]
-        + "\n"
-        + " ".join([line.strip() for line in __doc__.split("\n")[1:]])
+    # Header and rich column options for each column of the table.
+    # Column objects hold their own cells, so each table gets new ones.
+    COLUMNS = (
+        ("ID", {"justify": "right", "style": "green", "no_wrap": True}),
+        ("NAME", {"style": "spring_green3 italic"}),
+        ("DESCRIPTION", {"style": "spring_green4"}),
+        ("ACTIVE", {"style": "green"}),
     )
 
-    data = reactive(Table())
+    # The last table built, keyed by the state of both data files.
+    # Kept on the class, since each launch makes a new ChargeManager.
+    _table: Optional[Tuple[Tuple[Any, ...], Table]] = None
 
-    def get_data(self) -> Table:
-        """Function to retrieve Thymed data."""
-        with open(thymed._CHARGES) as f:
+    @staticmethod
+    def _stamp() -> Tuple[Any, ...]:
+        """The (mtime, size) of the charges and data files, None if missing."""
+        stamp: List[Optional[Tuple[int, int]]] = []
+        for path in (thymed._CHARGES, thymed._DATA):
             try:
-                codes = json.load(f, object_hook=thymed.object_decoder)
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stamp.append(None)
+            else:
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stamp)
+
+    def get_data(self) -> Table:
+        """Function to retrieve Thymed data.
+
+        The table is rebuilt only when the charges or data file changes.
+        The ACTIVE column depends on the punches, so both are checked.
+        """
+        key = self._stamp()
+        if ChargeManager._table is not None and ChargeManager._table[0] == key:
+            return ChargeManager._table[1]
 
-                # Sort the codes dictionary by key (code id)
-                sorted_codes = sorted(codes.items(), key=lambda kv: int(kv[0]))
-                codes = [x[1] for x in sorted_codes]
-            except json.JSONDecodeError:  # pragma: no cover
-                self.notify("Got JSON Error", severity="error")
-                # If the file is completely blank, we will get an error
-                codes = dict()
+        # Sorted by code id. The parse is reused until the file changes.
+        codes = thymed.ChargeCode.load_all()
 
         table = Table(style="spring_green2")
-        table.add_column("ID", justify="right", style="green", no_wrap=True)
-        table.add_column("NAME", style="spring_green3 italic")
-        table.add_column("DESCRIPTION", style="spring_green4")
-        table.add_column("ACTIVE", style="green")
+        for header, options in self.COLUMNS:
+            table.add_column(header, **options)
 
         for code in codes:
             table.add_row(
                 str(code.id), code.name, code.description, str(code.is_active)
             )
 
+        ChargeManager._table = (key, table)
         return table
 
+    def refresh_table(self) -> None:
+        """Show the codes again, e.g. after a write to the Charges file.
+
+        A write changes the file, so get_data builds the table again.
+        """
+        self.query_one("#chargetable", Static).update(self.get_data())
+
     def compose(self) -> ComposeResult:
         yield Title("ChargeCodes in Current Database")
-        self.data = self.get_data()
-        yield Static(self.data, classes="data")
+        yield Static(self.get_data(), classes="data", id="chargetable")
         yield Container(
             Button("Add", variant="success", id="add"),
             Button("Remove", variant="error", id="remove"),
@@ -211,6 +271,7 @@ class Statblock(Container):
         yield Static(f"Days = {self.delta.days}")
 
 
+@with_info
 class Reporting(Container):
     """Reporting functionality.
 
@@ -222,66 +283,62 @@ class Reporting(Container):
     long term storage or additional processing.
     """
 
-    # Info is just a formatted version of the docstring.
-    info = (
-        __doc__.split("\n")[0]
-        + "\n"
-        + " ".join([line.strip() for line in __doc__.split("\n")[1:]])
-    )
-
     # TODO: Initialize the code to be the Thymed default code option.
     code: reactive[str | None] = reactive(0)
     name: reactive[str | None] = reactive(None)
     delta: reactive[timedelta] = reactive(timedelta(days=35))
-    codes = reactive(DataTable(name="ChargeCodes"))
+    # Built again by get_codes on every compose
+    codes: DataTable[str]
     plot = reactive(None, recompose=True)
+    # The last report built, keyed by (code, delta)
+    _report: Optional[Tuple[Tuple[Optional[str], timedelta], "pd.DataFrame"]] = None
+    # Index of the next entry in PERIODS
+    _period_idx: int = 0
+    # The (id, name) of the code on each row of the codes table
+    _rows: Dict[RowKey, Tuple[int, str]] = {}
 
     def get_codes(self) -> Table:
         """Function to retrieve Thymed data."""
-        # WTF does clear even do??
-        # I need to hard reset it to get the behavior I want.
-        self.codes.clear(columns=True)
+        # A new table for each compose, rather than one built at import
+        # and shared by every Reporting.
         self.codes = DataTable(name="ChargeCodes")
         self.codes.add_columns("ID", "NAME")
 
-        with open(thymed._CHARGES) as f:
-            try:
-                codes = json.load(f, object_hook=thymed.object_decoder)
-
-                # Sort the codes dictionary by key (code id)
-                sorted_codes = sorted(codes.items(), key=lambda kv: int(kv[0]))
-                codes = [x[1] for x in sorted_codes]
-            except json.JSONDecodeError:  # pragma: no cover
-                self.notify("Got JSON Error", severity="error")
-                # If the file is completely blank, we will get an error
-                codes = dict()
-
-        for code in codes:
-            self.codes.add_row(str(code.id), code.name)
+        # Sorted by code id. The parse is reused until the file changes.
+        codes = thymed.ChargeCode.load_all()
+        keys = self.codes.add_rows((str(code.id), code.name) for code in codes)
+        # Selection looks the code back up here, instead of in the table.
+        self._rows = {key: (code.id, code.name) for key, code in zip(keys, codes)}
 
     def on_mount(self):
         """Initialize the plot."""
-        self.plot = self.query_one(PlotextPlot)
-        plt = self.plot.plt
-        y = plt.sin()  # sinusoidal test signal
-        plt.scatter(y)
-        plt.title("Scatter Plot")
+        # Left blank until a ChargeCode is selected.
+        self.plot = self.query_one("PlotextPlot")
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected):
         """What to do when a new row is selected."""
-        id, name = event.data_table.get_row(event.row_key)
-        self.code = int(id)
-        self.name = name
+        self.code, self.name = self._rows[event.row_key]
         self.replot()
 
+    def get_report(self) -> "pd.DataFrame":
+        """Return the report for the selected code and period.
+
+        The report is kept until another code or period is selected,
+        so the plot and an export of the same selection share it.
+        """
+        key = (self.code, self.delta)
+        if self._report is None or self._report[0] != key:
+            end = datetime.today()
+            start = end - self.delta
+            self._report = (key, TimeCard(self.code).general_report(start, end))
+        return self._report[1]
+
     def replot(self) -> None:
         """Call whenever we need to redo the plot."""
         plt = self.plot.plt
-        card = TimeCard(self.code)
-        end = datetime.today()
-        start = end - self.delta
-        df = card.general_report(start, end)
-        df["clock_in_day"] = df.clock_in.dt.strftime("%d/%m/%Y")
+        df = self.get_report()
+        # Kept out of the report itself, so it isn't added to exports.
+        clock_in_day = df.clock_in.dt.strftime("%d/%m/%Y")
         # TODO: Make the plot show an exact range, whether or not work entries are present. (Create a PR later.)
         # Create a new date range with daily increments over the full range.
         # The punches increments are variable (eg you may not work every day)
@@ -289,9 +346,12 @@ class Reporting(Container):
         # Reindex the dataframe on the new range, filling blanks with an int of zero.
         # df = df.set_index("clock_in_day").reindex(new_clock_in_day, fill_value=0).reset_index()
         # Need to convert the clock_in to string for plotext
-        dates = df.clock_in_day
+        dates = clock_in_day
+        # One bar per day. The report is already in time order, so the
+        # groups don't need sorting.
+        daily = df.hours.groupby(dates, sort=False).sum()
         plt.clear_data()
-        plt.bar(dates, df.hours)
+        plt.bar(daily.index.tolist(), daily.to_numpy())
         plt.title(self.name)
         plt.xlabel("Date")
         plt.ylabel("Hours")
@@ -301,7 +361,8 @@ class Reporting(Container):
     def cycle_period(self) -> None:
         """Change the timedelta period."""
         stats = self.query_one(Statblock)
-        period, delta = next(PERIODS)
+        period, delta = PERIODS[self._period_idx]
+        self._period_idx = (self._period_idx + 1) % len(PERIODS)
         stats.period = period
         stats.delta = delta
         self.delta = delta
@@ -310,22 +371,28 @@ class Reporting(Container):
     @textual.on(Button.Pressed, "#export")
     def write_excel(self) -> None:
         """Exports the data to an excel workbook."""
-        card = TimeCard(self.code)
-        end = datetime.today()
-        start = end - self.delta
-        df = card.general_report(start, end)
-        df.to_excel(f"timecard_{self.name}.xlsx")
-        df.to_csv(f"timecard_{self.name}.csv")
-        self.notify(f"Exported {self.name} to {Path.cwd()}", title="Export")
+        self.export(self.get_report(), self.name)
+
+    @work(thread=True, exclusive=True)
+    def export(self, df: "pd.DataFrame", name: str) -> None:
+        """Write the export files from a worker thread, so the UI isn't held up."""
+        df.to_excel(f"timecard_{name}.xlsx")
+        df.to_csv(f"timecard_{name}.csv")
+        self.app.call_from_thread(
+            self.notify, f"Exported {name} to {Path.cwd()}", title="Export"
+        )
 
     def compose(self) -> ComposeResult:
+        # Imported here, so plotext is only loaded if Reporting is opened.
+        from textual_plotext import PlotextPlot
+
         self.get_codes()
         self.codes.cursor_type = "row"
         yield Grid(
             PlotextPlot(),
             self.codes,
             # Placeholder(self.name),
-            Statblock(TimeCard(self.code)),
+            Statblock(),
             Container(
                 # Title("Period"), Rule(),
                 Button("Period", id="period"),
@@ -335,21 +402,16 @@ class Reporting(Container):
         )
 
 
+@with_info
 class Settings(ScrollableContainer):
     """View and change various settings relating to Thymed."""
 
-    # Info is just a formatted version of the docstring.
-    info = (
-        __doc__.split("\n")[0]
-        + "\n"
-        + " ".join([line.strip() for line in __doc__.split("\n")[1:]])
-    )
-
     def compose(self) -> ComposeResult:
         for _i in range(10):
             yield Horizontal(Static("A settings switch"), Switch())
 
 
+@with_info
 class UnderConstruction(Container):
     """This feature is still WIP.
 
@@ -357,13 +419,6 @@ class UnderConstruction(Container):
     a structurally equivalent placeholder!
     """
 
-    # Info is just a formatted version of the docstring.
-    info = (
-        __doc__.split("\n")[0]
-        + "\n"
-        + " ".join([line.strip() for line in __doc__.split("\n")[1:]])
-    )
-
     def compose(self) -> ComposeResult:
         yield Title(":hammer_and_wrench: WIP :hammer_and_wrench:")
 
@@ -379,25 +434,31 @@ class Body(Container):
     the sidebar menu or keybindings.
     """
 
-    applet = reactive(Placeholder(id="applet"))
-
     def compose(self) -> ComposeResult:
+        # Applets are swapped by removing this one, and mounting the new
+        # one in its place (see the ThymedApp launch actions).
         yield InfoPane(id="info")
-        yield self.applet
+        yield Placeholder(id="applet")
 
 
 class AddScreen(ModalScreen):
     """Screen with a dialog to add a ChargeCode."""
 
     def compose(self) -> ComposeResult:
+        # Keep the inputs, so submitting doesn't need to query for them.
+        self._charge_id = Input(placeholder="123456", id="charge_id")
+        self._charge_name = Input(placeholder="Name", id="charge_name")
+        self._charge_description = Input(
+            placeholder="Description", id="charge_description", classes="long"
+        )
         yield Grid(
             Title("Add new ChargeCode information", id="question"),
             Static("ID Number: ", classes="right"),
-            Input(placeholder="123456", id="charge_id"),
+            self._charge_id,
             Static("Name: ", classes="right"),
-            Input(placeholder="Name", id="charge_name"),
+            self._charge_name,
             Static("Description: ", classes="right"),
-            Input(placeholder="Description", id="charge_description", classes="long"),
+            self._charge_description,
             Static(),
             Static(
                 "Note: After submitting, you need to reload the Manager screen to see your new ChargeCode (Hit F2)."
@@ -408,11 +469,12 @@ class AddScreen(ModalScreen):
         )
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        charge_id = self.query_one("#charge_id").value
-        charge_name = self.query_one("#charge_name").value
-        charge_description = self.query_one("#charge_description").value
-        data = [charge_id, charge_name, charge_description]
         if event.button.id == "submit":
+            data = [
+                self._charge_id.value,
+                self._charge_name.value,
+                self._charge_description.value,
+            ]
             self.dismiss(data)
         else:
             self.app.pop_screen()
@@ -432,69 +494,103 @@ class ThymedApp(App[None]):
     ]
 
     show_sidebar = reactive(False)
+    # The applet launched by each of the sidebar's option buttons
+    OPTIONS = {
+        "punch": PunchForm,
+        "charge": ChargeManager,
+        "report": Reporting,
+        "admin": UnderConstruction,
+        "settings": Settings,
+    }
+    # The clock being updated, and the minute it last showed
+    _digits: Optional[Digits] = None
+    _clock_shown: Optional[datetime] = None
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         yield Container(Sidebar(classes="-hidden"), Body())
         yield Footer()
 
+    def on_mount(self) -> None:
+        # These widgets live for the whole app, so look them up only once.
+        self._body = self.query_one(Body)
+        self._info = self.query_one(InfoPane)
+        self._sidebar = self.query_one(Sidebar)
+        # The applet is swapped by _swap_applet, which keeps this current.
+        # Any, since it can be any of the applet classes.
+        self._applet: Any = self.query_one("#applet")
+
     def on_ready(self) -> None:
+        self.tick_clock()
+
+    def tick_clock(self) -> None:
+        """Update the clock, then wait for the start of the next minute.
+
+        The clock only shows minutes, so there's no need to wake up every
+        second. The wait is worked out from the wall clock each time, so
+        the ticks can't drift, and a little slack past the minute makes
+        sure the new minute has started.
+        """
         self.update_clock()
-        self.set_interval(1, self.update_clock)
+        now = datetime.now()
+        self.set_timer(60.05 - now.second - now.microsecond / 1e6, self.tick_clock)
 
-    def update_clock(self) -> None:
-        clock = datetime.now()
-        try:
-            self.query_one(Digits).update(f"{clock:%a %d %b %Y, %I:%M%p}")
-        except NoMatches:
-            # We build and destroy the clock with the active applet.
-            # A lot of the time it just doesn't exist, so ignore this.
-            pass
+    def update_clock(self, digits: Optional[Digits] = None) -> None:
+        """Show the current minute on the clock.
+
+        Redrawn only when the minute changes, or when a new clock is
+        given (PunchForm passes its own as it mounts).
+        """
+        clock = datetime.now().replace(second=0, microsecond=0)
+        if digits is not None:
+            self._digits = digits
+        else:
+            digits = self._digits
+            if digits is None or not digits.is_attached:
+                try:
+                    digits = self._digits = self.query_one(Digits)
+                except NoMatches:
+                    # We build and destroy the clock with the active applet.
+                    # A lot of the time it just doesn't exist, so ignore this.
+                    self._digits = None
+                    return
+            elif clock == self._clock_shown:
+                return
+        digits.update(f"{clock:%a %d %b %Y, %I:%M%p}")
+        self._clock_shown = clock
+
+    def _swap_applet(self, cls: type) -> None:
+        """Replace the current applet with a new one of the given class."""
+        self._applet.remove()
+        self._applet = cls(id="applet")
+        self._info.info = self._applet.info
+        self._body.mount(self._applet)
 
     def action_launch_punch(self) -> None:
         """This method 'launches' the punch form applet."""
-        self.query_one("#applet").remove()
-        new = PunchForm(id="applet")
-        self.query_one(InfoPane).info = new.info
-        self.query_one(Body).mount(new)
+        self._swap_applet(PunchForm)
 
     def action_launch_chargecode(self) -> None:
         """This method 'launches' the chargecode manager applet."""
-        self.query_one("#applet").remove()
-        new = ChargeManager(id="applet")
-        self.query_one(InfoPane).info = new.info
-        self.query_one(Body).mount(new)
+        self._swap_applet(ChargeManager)
 
     def action_launch_report(self) -> None:
         """This method 'launches' the reporting applet."""
-        self.query_one("#applet").remove()
-        new = Reporting(id="applet")
-        self.query_one(InfoPane).info = new.info
-        self.query_one(Body).mount(new)
+        self._swap_applet(Reporting)
 
     def action_launch_admin(self) -> None:
         """This method 'launches' the admin applet."""
-        self.query_one("#applet").remove()
-        new = UnderConstruction(id="applet")
-        self.query_one(InfoPane).info = new.info
-        self.query_one(Body).mount(new)
+        self._swap_applet(UnderConstruction)
 
     def action_launch_settings(self) -> None:
         """This method 'launches' the settings applet."""
-        self.query_one("#applet").remove()
-        new = Settings(id="applet")
-        self.query_one(InfoPane).info = new.info
-        self.query_one(Body).mount(new)
+        self._swap_applet(Settings)
 
     def action_toggle_sidebar(self) -> None:
-        sidebar = self.query_one(Sidebar)
+        # Clearing focus first also covers a focused widget inside the
+        # sidebar, so there's no need to search it before hiding.
         self.set_focus(None)
-        if sidebar.has_class("-hidden"):
-            sidebar.remove_class("-hidden")
-        else:
-            if sidebar.query("*:focus"):
-                self.screen.set_focus(None)
-            sidebar.add_class("-hidden")
+        self._sidebar.toggle_class("-hidden")
 
     def punch(self, id: int):
         """Method to do the chargecode punching."""
@@ -508,8 +604,7 @@ class ThymedApp(App[None]):
                 raise KeyError
             status_pre = "Active" if code.is_active else "Inactive"
             code.punch()
-            code.write_class()
-            code.write_json()
+            code.save()
             status_post = "Active" if code.is_active else "Inactive"
             message = f"Punching Charge: {id}, {code.name}.\nFrom {status_pre} to {status_post}"
             severity = "information"
@@ -542,23 +637,13 @@ class ThymedApp(App[None]):
     @textual.on(Button.Pressed, ".option")
     def option_buttons(self, event: Button.Pressed) -> None:
         """What to do when the option buttons are pressed."""
-        classes = event.button.classes
-
-        if "punch" in classes:
-            self.action_toggle_sidebar()
-            self.action_launch_punch()
-        elif "charge" in classes:
-            self.action_toggle_sidebar()
-            self.action_launch_chargecode()
-        elif "report" in classes:
-            self.action_toggle_sidebar()
-            self.action_launch_report()
-        elif "admin" in classes:
-            self.action_toggle_sidebar()
-            self.action_launch_admin()
-        elif "settings" in classes:
-            self.action_toggle_sidebar()
-            self.action_launch_settings()
+        # Each option button has one class naming its applet.
+        for name in event.button.classes:
+            applet = self.OPTIONS.get(name)
+            if applet is not None:
+                self.action_toggle_sidebar()
+                self._swap_applet(applet)
+                break
 
     @textual.on(Button.Pressed, "#add")
     def code_screen(self, event: Button.Pressed):
@@ -575,22 +660,19 @@ class ThymedApp(App[None]):
             It takes data and calls the base Thymed methods to build
             a ChargeCode object, then write it to the database.
 
-            After we finish adding the code, we call get_data on
-            the ChargeManager screen to refresh the table.
+            After we finish adding the code, we refresh the table
+            on the ChargeManager screen.
             """
             id, name, description = data
             charge = thymed.ChargeCode(name, description, int(id))
             charge.write_class()
 
-            applet = self.query_one("#applet")
-            applet.data = applet.get_data()
+            self._applet.refresh_table()
 
         self.push_screen(AddScreen(), add_code)
 
     def action_open_link(self, link: str) -> None:
         self.app.bell()
-        import webbrowser
-
         webbrowser.open(link)
 
 
@@ -0,0 +1,94 @@
+"""Shared fixtures for the thymed test suite."""
+
+import json
+from typing import Callable
+from typing import Iterator
+
+import pytest
+
+import thymed
+
+# CLEANUP UTILITIES
+
+
+def _remove_test_charge(*ids: str) -> None:
+    """Cleanup the test ChargeCodes (99999999 if no ids are given).
+
+    Testing creates a ChargeCode. This function
+    manually removes the data, since deleting/removing
+    ChargeCode objects is not currently supported.
+    Several ids can be removed with a single rewrite of the file.
+    """
+    with open(thymed._CHARGES) as f:
+        # We know it won't be blank, since we only call
+        # this function after we tested it already. So
+        # no try:except like the rest of the codebase.
+        codes = json.load(f)
+
+    # Remove the testing codes with a pop method.
+    for id in ids or ("99999999",):
+        _ = codes.pop(id)
+
+    # The codes are kept as the plain dicts read from the file (they
+    # already have their __type__), so they're written back as they are.
+    # Serialize before opening, so a failure can't leave the file truncated.
+    payload = json.dumps(codes)
+    with open(thymed._CHARGES, "w") as f:
+        # Write the new set of codes back to the file.
+        _ = f.write(payload)
+
+
+def _remove_test_data(id: str = "99999999") -> None:
+    """Cleanup the test ChargeCode punch data.
+
+    Testing creates a ChargeCode. This function
+    manually removes the data, since deleting/removing
+    ChargeCode objects is not currently supported.
+    """
+    with open(thymed._DATA) as f:
+        # We know it won't be blank, since we only call
+        # this function after we tested it already. So
+        # no try:except like the rest of the codebase.
+        times = json.load(f)
+
+    # Remove the testing code with a pop method.
+    _ = times.pop(id)
+
+    # Serialize before opening, so a failure can't leave the file truncated.
+    payload = json.dumps(times)
+    with open(thymed._DATA, "w") as f:
+        # Write the rest of times back to the file.
+        _ = f.write(payload)
+
+
+# FIXTURES
+@pytest.fixture(scope="session")
+def remove_test_charge() -> Callable[..., None]:
+    """Return the cleanup for the test ChargeCodes."""
+    return _remove_test_charge
+
+
+@pytest.fixture(scope="session")
+def remove_test_data() -> Callable[..., None]:
+    """Return the cleanup for the test ChargeCode punch data."""
+    return _remove_test_data
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_snapshot() -> Iterator[None]:
+    """Put the data files back the way they were after the test session.
+
+    Most tests read and write the real database, and clean up after
+    themselves. A test that fails partway can't, so the original bytes of
+    both files are kept in memory and written back once at the end.
+    """
+    paths = [thymed._CHARGES, thymed._DATA]
+    saved = [path.read_bytes() if path.exists() else None for path in paths]
+
+    yield
+
+    for path, data in zip(paths, saved):
+        if data is None:
+            path.unlink(missing_ok=True)
+        else:
+            path.write_bytes(data)
@@ -1,68 +1,19 @@
 """Test Cases for the ChargeCode class."""
 
 import datetime as dt
+import itertools
 import json
-import random
-import time
+import os
+import sys
+from typing import Iterator
 
-import pandas as pd
+import numpy as np
 import pytest
-from rich.console import Console
 
+import thymed
 from thymed import _CHARGES
 from thymed import _DATA
 from thymed import ChargeCode
-from thymed import object_decoder
-
-
-# CLEANUP UTILITIES
-
-
-def remove_test_charge(id: str = "99999999") -> None:
-    """Cleanup the test ChargeCode.
-
-    Testing creates a ChargeCode. This function
-    manually removes the data, since deleting/removing
-    ChargeCode objects is not currently supported.
-    """
-    with open(_CHARGES) as f:
-        # We know it won't be blank, since we only call
-        # this function after we tested it already. So
-        # no try:except like the rest of the codebase.
-        codes = json.load(f, object_hook=object_decoder)
-
-    with open(_CHARGES, "w") as f:
-        # Remove the testing code with a pop method.
-        _ = codes.pop(id)
-        # Convert the dict of ChargeCodes into a plain dict
-        out = {}
-        for k, v in codes.items():
-            dict_val = v.__dict__
-            dict_val["__type__"] = "ChargeCode"
-            del dict_val["times"]
-            out[k] = dict_val
-        # Write the new set of codes back to the file.
-        _ = f.write(json.dumps(out, indent=2))
-
-
-def remove_test_data(id: str = "99999999") -> None:
-    """Cleanup the test ChargeCode punch data.
-
-    Testing creates a ChargeCode. This function
-    manually removes the data, since deleting/removing
-    ChargeCode objects is not currently supported.
-    """
-    with open(_DATA) as f:
-        # We know it won't be blank, since we only call
-        # this function after we tested it already. So
-        # no try:except like the rest of the codebase.
-        times = json.load(f)
-
-    with open(_DATA, "w") as f:
-        # Remove the testing code with a pop method.
-        _ = times.pop(id)
-        # Write the rest of times back to the file.
-        _ = f.write(json.dumps(times, indent=2))
 
 
 # FIXTURES
@@ -73,6 +24,26 @@ def blank_code() -> ChargeCode:
     return blank
 
 
+@pytest.fixture
+def fake_clock(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Make punches read a clock that moves a minute ahead on every call.
+
+    Only thymed's punch clock is replaced, so a test doesn't need to
+    sleep between punches. The punches are plain datetimes, so they can
+    be saved and read back as usual. No timestamp parsed under the fake
+    clock is left in thymed's cache for the tests after.
+    """
+    ticks = itertools.count()
+    start = dt.datetime(2024, 1, 1, 8)
+    monkeypatch.setattr(
+        thymed, "_now", lambda: start + dt.timedelta(minutes=next(ticks))
+    )
+
+    yield
+
+    thymed._parse_iso.cache_clear()
+
+
 @pytest.fixture
 def fake_times(
     start: dt.datetime = None,
@@ -81,7 +52,6 @@ def fake_times(
     description: str = "These times are fake.",
     id: int = 99999999,
     n: int = 250,
-    console: Console = None,
 ) -> None:
     """Temporary function for testing."""
     # Initialize default inputs
@@ -89,46 +59,22 @@ def fake_times(
         start = dt.datetime(2022, 5, 31)
     if not end:
         end = dt.datetime.today()
-    if not console:
-        console = Console()
-    # Initialize the output variables
-    ins = []
-    outs = []
-    # Iteration variable. We don't want to repeat days or "work" them out of order.
-    iter_start = start
-    for _i in range(n):
-        # Pick a random timestamp in the time range
-        date = dt.timedelta(days=random.randint(0, 2)) + iter_start
-        iter_start = date
-        # Check if we should stop here (beyond the end date)
-        if (iter_start >= end) or (date > end):
-            break
-
-        # Generate the timedelta for punch in/out on that day
-        in_delta = random.randint(-220, 1850)
-        out_delta = random.randint(-1000, 1550)
-
-        # Add the deltas for in/out
-        in_punch = dt.datetime(
-            year=date.year, month=date.month, day=date.day, hour=8
-        ) + dt.timedelta(seconds=in_delta)
-        ins.append(in_punch)
-
-        out_punch = dt.datetime(
-            year=date.year, month=date.month, day=date.day, hour=15
-        ) + dt.timedelta(seconds=out_delta)
-        outs.append(out_punch)
-
-    df = pd.DataFrame()
-    df["in_punch"] = ins
-    df["out_punch"] = outs
-
-    console.print(df)
+    # Step forward 0-2 days at a time, so we don't "work" days out of order.
+    days = np.cumsum(np.random.randint(0, 3, size=n)).astype("timedelta64[D]")
+    # Stop at the first day beyond the end date
+    cutoff = np.searchsorted(np.datetime64(start, "s") + days, np.datetime64(end, "s"))
+    days = days[:cutoff]
+
+    # Punch in around 8:00 and out around 15:00 on each of those days
+    base = np.datetime64(start, "D") + days
+    in_delta = np.random.randint(-220, 1851, size=cutoff).astype("timedelta64[s]")
+    out_delta = np.random.randint(-1000, 1551, size=cutoff).astype("timedelta64[s]")
+    ins = (base + np.timedelta64(8, "h") + in_delta).astype("datetime64[s]").tolist()
+    outs = (base + np.timedelta64(15, "h") + out_delta).astype("datetime64[s]").tolist()
 
     my_code = ChargeCode(name, description, id)
-    console.print(my_code)
 
-    my_code.times = tuple(zip(ins, outs))
+    my_code.punch_many(ins, outs)
     my_code.write_class()
     my_code.write_json()
 
@@ -142,19 +88,45 @@ def test_create() -> None:
     assert not the_code.is_active
 
 
-def test_punch(blank_code) -> None:
-    """Punches a charge code, sees active. Punches again, sees inactive."""
+def test_punch(blank_code, fake_clock, remove_test_charge, remove_test_data) -> None:
+    """Punches a charge code, sees active. Punches again, sees inactive.
+
+    The punch is saved, and read back the same.
+    """
     blank_code.punch()
     assert blank_code.is_active
-    time.sleep(0.1)
     blank_code.punch()
     assert not blank_code.is_active
+    start = dt.datetime(2024, 1, 1, 8)
+    assert blank_code.times[-1] == (start, start + dt.timedelta(minutes=1))
 
+    blank_code.write_class()
+    blank_code.write_json()
+    saved = ChargeCode("Blank boi", "Nothing here...", 99999998)
+    assert saved.times[-1] == blank_code.times[-1]
+    remove_test_charge("99999998")
+    remove_test_data("99999998")
+
+
+def test_punch_many(blank_code) -> None:
+    """Bulk punches are paired up in order, and leave the code inactive."""
+    start = dt.datetime(2022, 6, 1, 8)
+    ins = [start + dt.timedelta(days=i) for i in range(5)]
+    outs = [x + dt.timedelta(hours=8) for x in ins]
+    n = len(blank_code.times)
 
-def test_data(blank_code) -> None:
+    blank_code.punch_many(ins, outs)
+    assert len(blank_code.times) == n + 5
+    assert blank_code.times[-1] == (ins[-1], outs[-1])
+    assert not blank_code.is_active
+
+    with pytest.raises(ValueError):
+        blank_code.punch_many(ins, outs[:-1])
+
+
+def test_data(blank_code, remove_test_charge, remove_test_data) -> None:
     """Write some data, and instantiate a code that recognizes the times."""
     blank_code.punch()
-    time.sleep(0.1)
     blank_code.punch()
 
     blank_code.write_class()
@@ -165,7 +137,128 @@ def test_data(blank_code) -> None:
     remove_test_data("99999998")
 
 
-def test_multiple() -> None:
+def test_reload(blank_code, remove_test_charge, remove_test_data) -> None:
+    """A fresh instance sees punches written after an earlier read."""
+    before = len(ChargeCode("Blank boi", "Nothing here...", 99999998).times)
+    blank_code.punch()
+    blank_code.write_class()
+    blank_code.write_json()
+
+    after = ChargeCode("Blank boi", "Nothing here...", 99999998)
+    assert len(after.times) == before + 1
+    assert after.is_active
+    remove_test_charge("99999998")
+    remove_test_data("99999998")
+
+
+def test_pretty(blank_code, remove_test_charge, remove_test_data) -> None:
+    """Data files are compact by default, and indented when asked."""
+    blank_code.punch()
+    blank_code.write_class()
+    blank_code.write_json()
+    assert b"\n" not in _DATA.read_bytes()
+
+    blank_code.write_json(pretty=True)
+    assert _DATA.read_text().startswith("{\n  ")
+    remove_test_charge("99999998")
+    remove_test_data("99999998")
+
+
+def test_str_data_path(blank_code, tmp_path) -> None:
+    """Punches can be written to a data file given as a plain str."""
+    path = tmp_path / "data.json"
+    # The second write reads back the file made by the first
+    for _ in range(2):
+        blank_code.punch()
+        blank_code.write_json(str(path))
+    assert len(json.loads(path.read_bytes())["99999998"]) == len(blank_code.times)
+
+
+def test_save(blank_code, remove_test_charge, remove_test_data) -> None:
+    """Saving writes the code once, and its punches every time."""
+    blank_code.punch()
+    blank_code.save()
+    stamp = _CHARGES.stat().st_mtime_ns
+
+    blank_code.punch()
+    blank_code.save()
+    # The code was already stored, so only the punches were rewritten
+    assert _CHARGES.stat().st_mtime_ns == stamp
+    after = ChargeCode("Blank boi", "Nothing here...", 99999998)
+    assert after.times == blank_code.times
+    remove_test_charge("99999998")
+    remove_test_data("99999998")
+
+
+@pytest.mark.parametrize("step", ["_dumps", "_atomic_write"])
+def test_failed_write(
+    blank_code,
+    monkeypatch: pytest.MonkeyPatch,
+    step,
+    remove_test_charge,
+    remove_test_data,
+) -> None:
+    """A write that fails doesn't leave unsaved punches in the read cache."""
+    blank_code.punch()
+    blank_code.save()
+    before = ChargeCode("Blank boi", "Nothing here...", 99999998).times
+
+    def fail(*args):
+        raise OSError("Disk full")
+
+    # Fail while serializing, or while writing the file
+    monkeypatch.setattr(thymed, step, fail)
+    blank_code.punch()
+    with pytest.raises(OSError):
+        blank_code.write_json()
+    monkeypatch.undo()
+
+    after = ChargeCode("Blank boi", "Nothing here...", 99999998)
+    assert after.times == before
+    remove_test_charge("99999998")
+    remove_test_data("99999998")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Needs symlinks and modes")
+def test_write_through_link(blank_code, tmp_path) -> None:
+    """Writing a symlinked data file updates its target, keeping its mode."""
+    target = tmp_path / "punches.dat"
+    target.write_text("{}")
+    target.chmod(0o644)
+    link = tmp_path / "link.dat"
+    link.symlink_to(target)
+
+    blank_code.punch()
+    blank_code.write_json(data=link)
+    assert link.is_symlink()
+    assert "99999998" in json.loads(target.read_text())
+    assert target.stat().st_mode & 0o777 == 0o644
+
+    # A brand new file gets the umask default, not mkstemp's private mode
+    fresh = tmp_path / "fresh.dat"
+    blank_code.write_json(data=fresh)
+    umask = os.umask(0)
+    os.umask(umask)
+    assert fresh.stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_load_all(blank_code, remove_test_charge, remove_test_data) -> None:
+    """Bulk loading matches loading each code on its own."""
+    blank_code.punch()
+    blank_code.write_class()
+    blank_code.write_json()
+
+    codes = ChargeCode.load_all()
+    ids = [code.id for code in codes]
+    assert ids == sorted(ids)
+    loaded = codes[ids.index(99999998)]
+    assert loaded == ChargeCode("Blank boi", "Nothing here...", 99999998)
+    assert loaded.is_active
+    remove_test_charge("99999998")
+    remove_test_data("99999998")
+
+
+def test_multiple(remove_test_charge) -> None:
     """Make multiple for post_init checks."""
     one = ChargeCode("One", "Tester 1, Tester One.", 1)
     one.write_class()
@@ -175,14 +268,14 @@ def test_multiple() -> None:
     three = ChargeCode("Two", "Tester 3, Tester Two?", 2)
     three.write_class()
 
-    remove_test_charge("1")
-    remove_test_charge("2")
+    remove_test_charge("1", "2")
 
 
-def test_fake_time(fake_times, blank_code) -> None:
+def test_fake_time(
+    fake_times, blank_code, remove_test_charge, remove_test_data
+) -> None:
     """Build some real data to work with."""
     blank_code.punch()
-    time.sleep(0.1)
     # Writing JSON after json already has been written,
     # tests different lines of code.
     blank_code.write_class()
@@ -191,7 +284,6 @@ def test_fake_time(fake_times, blank_code) -> None:
     remove_test_charge()
     remove_test_data()
 
-    time.sleep(0.1)
     blank_code.punch()
     blank_code.write_json(log=True)
     remove_test_charge("99999998")
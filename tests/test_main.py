@@ -1,44 +1,41 @@
 """Test cases for the __main__ module."""
 
 import json
+from pathlib import Path
 
 import pytest
 from click.testing import CliRunner
 
-from thymed import _CHARGES
+import thymed
 from thymed import __main__
-from thymed import object_decoder
 
 
-# CLEANUP UTILITIES
-def remove_test_charge(id: str = "99999999") -> None:
-    """Cleanup the test ChargeCode.
+# FIXTURES
+@pytest.fixture(autouse=True)
+def data_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Point thymed at fresh data files in a temporary directory.
 
-    Testing creates a ChargeCode. This function
-    manually removes the data, since deleting/removing
-    ChargeCode objects is not currently supported.
+    The commands then never touch the real database, so no test
+    leaves codes behind for the others, or needs cleaning up after.
     """
-    with open(_CHARGES) as f:
-        # We know it won't be blank, since we only call
-        # this function after we tested it already. So
-        # no try:except like the rest of the codebase.
-        codes = json.load(f, object_hook=object_decoder)
-
-    with open(_CHARGES, "w") as f:
-        # Remove the testing code with a pop method.
-        _ = codes.pop(id)
-        # Convert the dict of ChargeCodes into a plain dict
-        out = {}
-        for k, v in codes.items():
-            dict_val = v.__dict__
-            dict_val["__type__"] = "ChargeCode"
-            del dict_val["times"]
-            out[k] = dict_val
-        # Write the new set of codes back to the file.
-        _ = f.write(json.dumps(out, indent=2))
+    monkeypatch.setattr(thymed, "_CHARGES", tmp_path / "charges.json")
+    monkeypatch.setattr(thymed, "_DATA", tmp_path / "data.json")
 
 
 @pytest.fixture
+def code_zero(data_files: None) -> thymed.ChargeCode:
+    """Create ChargeCode 0 (the default code in a fresh config)."""
+    code = thymed.ChargeCode("default", "description", 0)
+    code.write_class()
+    return code
+
+
+def punches(id: int) -> list:
+    """Return the punches saved for a code in the temporary data file."""
+    return json.loads(thymed._DATA.read_bytes())[str(id)]
+
+
+@pytest.fixture(scope="session")
 def runner() -> CliRunner:
     """Fixture for invoking command-line interfaces."""
     return CliRunner()
@@ -70,34 +67,45 @@ def test_main_create(runner: CliRunner) -> None:
     assert result.exit_code == 0
 
 
-def test_main_punch_default(runner: CliRunner) -> None:
+def test_main_punch_default(runner: CliRunner, code_zero: thymed.ChargeCode) -> None:
     """It exits with a status code of zero.
 
-    This test will call the default code. In the CI,
-    this chargecode will not exist, but the error is
-    handled and the command continues on.
-
-    TODO: We need to _actually_ test punching charge codes...
+    This test will call the default code, and the punch
+    is written to the data file.
     """
     result = runner.invoke(__main__.punch)
     assert result.exit_code == 0
+    # An open punch is saved with its clock in only.
+    assert [len(times) for times in punches(code_zero.id)] == [1]
+
+
+def test_main_punch_code(runner: CliRunner, code_zero: thymed.ChargeCode) -> None:
+    """It exits with a status code of zero.
+
+    This test will call a specific punch code. Punching it
+    twice closes the punch it opened.
+    """
+    for _ in range(2):
+        result = runner.invoke(__main__.punch, "0")
+        assert result.exit_code == 0
+    ((start, end),) = punches(code_zero.id)
+    assert start <= end
 
 
-def test_main_punch_code(runner: CliRunner) -> None:
+def test_main_punch_missing(runner: CliRunner) -> None:
     """It exits with a status code of zero.
 
-    This test will call a specific punch code. Again,
-    in the automated CI this will not exist.
+    A code that doesn't exist is handled, and nothing is written.
     """
     result = runner.invoke(__main__.punch, "0")
     assert result.exit_code == 0
+    assert not thymed._DATA.exists()
 
 
 def test_main_punch_multiple(runner: CliRunner) -> None:
     """It exits with a status code of zero.
 
-    This will execute all the remaining cleanup
-    lines in our cleanup function.
+    Both codes are written to the charges file.
     """
     _ = runner.invoke(
         __main__.create, input="\n".join(["test_code", "description", "99999999", "y"])
@@ -106,8 +114,8 @@ def test_main_punch_multiple(runner: CliRunner) -> None:
         __main__.create, input="\n".join(["test_code", "description", "99999998", "y"])
     )
 
-    remove_test_charge()
-    remove_test_charge("99999998")
+    codes = json.loads(thymed._CHARGES.read_bytes())
+    assert {"99999999", "99999998"} <= codes.keys()
 
 
 def test_main_list_generic(runner: CliRunner) -> None:
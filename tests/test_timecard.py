@@ -1,123 +1,60 @@
 """Test Cases for the ChargeCode class."""
 
 import datetime as dt
-import json
 import random
+from typing import Iterator
 
-import pandas as pd
+import numpy as np
 import pytest
-from rich.console import Console
 
-from thymed import _CHARGES
-from thymed import _DATA
 from thymed import ChargeCode
 from thymed import TimeCard
-from thymed import object_decoder
-
-
-# CLEANUP UTILITIES
-
-
-def remove_test_charge(id: str = "99999999") -> None:
-    """Cleanup the test ChargeCode.
-
-    Testing creates a ChargeCode. This function
-    manually removes the data, since deleting/removing
-    ChargeCode objects is not currently supported.
-    """
-    with open(_CHARGES) as f:
-        # We know it won't be blank, since we only call
-        # this function after we tested it already. So
-        # no try:except like the rest of the codebase.
-        codes = json.load(f, object_hook=object_decoder)
-
-    with open(_CHARGES, "w") as f:
-        # Remove the testing code with a pop method.
-        _ = codes.pop(id)
-        # Convert the dict of ChargeCodes into a plain dict
-        out = {}
-        for k, v in codes.items():
-            dict_val = v.__dict__
-            dict_val["__type__"] = "ChargeCode"
-            del dict_val["times"]
-            out[k] = dict_val
-        # Write the new set of codes back to the file.
-        _ = f.write(json.dumps(out, indent=2))
-
-
-def remove_test_data(id: str = "99999999") -> None:
-    """Cleanup the test ChargeCode punch data.
-
-    Testing creates a ChargeCode. This function
-    manually removes the data, since deleting/removing
-    ChargeCode objects is not currently supported.
-    """
-    with open(_DATA) as f:
-        # We know it won't be blank, since we only call
-        # this function after we tested it already. So
-        # no try:except like the rest of the codebase.
-        times = json.load(f)
-
-    with open(_DATA, "w") as f:
-        # Remove the testing code with a pop method.
-        _ = times.pop(id)
-        # Write the rest of times back to the file.
-        _ = f.write(json.dumps(times, indent=2))
 
 
 # FIXTURES
-@pytest.fixture
+@pytest.fixture(scope="module")
 def fake_times(
+    remove_test_charge,
+    remove_test_data,
     start: dt.datetime = None,
     end: dt.datetime = None,
     name: str = "FakeCode",
     description: str = "These times are fake.",
     id: int = 99999999,
     n: int = 60,
-    console: Console = None,
-) -> None:
+) -> Iterator[None]:
     """Temporary function for testing."""
     # Initialize default inputs
     if not end:
         end = dt.datetime.today()
     if not start:
         start = end - dt.timedelta(days=35)
-    if not console:
-        console = Console()
-    # Initialize the output variables
-    ins = []
-    outs = []
-    # Iteration variable. We don't want to repeat days or "work" them out of order.
-    iter_start = start
-    for _i in range(n):
-        # Pick a random timestamp in the time range
-        date = dt.timedelta(days=random.randint(0, 2)) + iter_start
-        iter_start = date
-        # Check if we should stop here (beyond the end date)
-        if (iter_start >= end) or (date > end):
-            break
-
-        # Generate the timedelta for punch in/out on that day
-        in_delta = random.randint(-220, 1850)
-        out_delta = random.randint(-1000, 1550)
-
-        # Add the deltas for in/out
-        in_punch = dt.datetime(
-            year=date.year, month=date.month, day=date.day, hour=8
-        ) + dt.timedelta(seconds=in_delta)
-        ins.append(in_punch)
-
-        out_punch = dt.datetime(
-            year=date.year, month=date.month, day=date.day, hour=15
-        ) + dt.timedelta(seconds=out_delta)
-        outs.append(out_punch)
+    # Step forward 0-2 days at a time, so we don't "work" days out of order.
+    days = np.cumsum(np.random.randint(0, 3, size=n)).astype("timedelta64[D]")
+    # Stop at the first day beyond the end date
+    cutoff = np.searchsorted(np.datetime64(start, "s") + days, np.datetime64(end, "s"))
+    days = days[:cutoff]
+
+    # Punch in around 8:00 and out around 15:00 on each of those days
+    base = np.datetime64(start, "D") + days
+    in_delta = np.random.randint(-220, 1851, size=cutoff).astype("timedelta64[s]")
+    out_delta = np.random.randint(-1000, 1551, size=cutoff).astype("timedelta64[s]")
+    ins = (base + np.timedelta64(8, "h") + in_delta).astype("datetime64[s]").tolist()
+    outs = (base + np.timedelta64(15, "h") + out_delta).astype("datetime64[s]").tolist()
 
     my_code = ChargeCode(name, description, id)
 
-    my_code.times = tuple(zip(ins, outs))
+    my_code.punch_many(ins, outs)
     my_code.write_class()
     my_code.write_json()
 
+    # The reports only read the data, so every test in the module shares
+    # it, and it's cleaned up once at the end.
+    yield
+
+    remove_test_charge()
+    remove_test_data()
+
 
 # # #      T E S T S     # # #
 
@@ -131,43 +68,45 @@ def test_timecard():
     _ = TimeCard(99999998)
 
 
-def test_weekly(fake_times):
+@pytest.mark.parametrize(
+    "report", ["weekly_report", "pay_period_report", "monthly_report"]
+)
+def test_report(fake_times, report):
     """Can build a TimeCard and pull the report."""
-    weekly = TimeCard(99999999)
-    df = weekly.weekly_report()
-
-    assert isinstance(df, pd.DataFrame)
-    assert not df.empty
-
-    remove_test_charge()
-    remove_test_data()
+    # Only loaded when a report is built, like in the package itself.
+    import pandas as pd
 
-
-def test_period(fake_times):
-    """Can build a TimeCard and pull the report."""
-    period = TimeCard(99999999)
-    df = period.pay_period_report()
+    card = TimeCard(99999999)
+    df = getattr(card, report)()
 
     assert isinstance(df, pd.DataFrame)
     assert not df.empty
 
-    remove_test_charge()
-    remove_test_data()
 
+def test_hours_rounding(remove_test_charge, remove_test_data):
+    """Minutes round to tenths of an hour like Python's round().
 
-def test_monthly(fake_times):
-    """Can build a TimeCard and pull the report."""
-    monthly = TimeCard(99999999)
-    df = monthly.monthly_report()
+    These minute values are the ones where rounding the whole column
+    at once would round the other way.
+    """
+    start = dt.datetime(2022, 6, 1, 8)
+    minutes = [219, 657, 3, 9, 21, 27, 39, 57]
+    ins = [start + dt.timedelta(days=i) for i in range(len(minutes))]
+    outs = [x + dt.timedelta(minutes=m) for x, m in zip(ins, minutes)]
+    code = ChargeCode("Rounding", "Punches with awkward minutes.", 99999997)
+    code.punch_many(ins, outs)
+    code.write_class()
+    code.write_json()
 
-    assert isinstance(df, pd.DataFrame)
-    assert not df.empty
+    df = TimeCard(99999997).general_report(start, outs[-1])
+    assert df.hours.tolist() == [3.7, 10.9, 0.1, 0.1, 0.3, 0.5, 0.7, 0.9]
 
-    remove_test_charge()
-    remove_test_data()
+    remove_test_charge("99999997")
+    remove_test_data("99999997")
 
 
 if __name__ == "__main__":  # pragma: no cover
+    from rich.console import Console
 
     def make_times(
         start: dt.datetime = None,
@@ -216,7 +155,7 @@ if __name__ == "__main__":  # pragma: no cover
 
         my_code = ChargeCode(name, description, id)
 
-        my_code.times = tuple(zip(ins, outs))
+        my_code.punch_many(ins, outs)
         my_code.write_class()
         my_code.write_json()
 